@@ -13,6 +13,7 @@ Uso:
 import anyio
 import sys
 import argparse
+import functools
 from typing import Optional
 from pathlib import Path
 
@@ -155,8 +156,9 @@ async def run_examples():
     print("\n✅ Exemplos concluídos!")
 
 
-async def main():
-    """Função principal do CLI."""
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Constrói o parser de argumentos do CLI (uma única vez por processo)."""
     parser = argparse.ArgumentParser(
         description="Claude Code SDK - Interface de linha de comando",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -213,7 +215,13 @@ Exemplos:
         help="Não mostrar cabeçalho"
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+async def main(args: Optional[argparse.Namespace] = None):
+    """Função principal do CLI."""
+    if args is None:
+        args = _build_parser().parse_args()
     
     # Mostra cabeçalho (a menos que --no-header)
     if not args.no_header:
@@ -1,6 +1,7 @@
 """Message parser for Claude Code SDK responses."""
 
 import logging
+from collections.abc import Callable
 from typing import Any
 
 from .._errors import MessageParseError
@@ -20,6 +21,80 @@ from ..sdk_types import (
 logger = logging.getLogger(__name__)
 
 
+def _parse_blocks(
+    blocks: list[dict[str, Any]], allow_thinking: bool
+) -> list[ContentBlock]:
+    """Build content blocks, skipping unknown block types."""
+    content_blocks: list[ContentBlock] = []
+    append = content_blocks.append
+    for block in blocks:
+        match block["type"]:
+            case "text":
+                append(TextBlock(text=block["text"]))
+            case "tool_use":
+                append(
+                    ToolUseBlock(
+                        id=block["id"], name=block["name"], input=block["input"]
+                    )
+                )
+            case "tool_result":
+                append(
+                    ToolResultBlock(
+                        tool_use_id=block["tool_use_id"],
+                        content=block.get("content"),
+                        is_error=block.get("is_error"),
+                    )
+                )
+            case "thinking" if allow_thinking:
+                append(
+                    ThinkingBlock(
+                        thinking=block["thinking"], signature=block["signature"]
+                    )
+                )
+    return content_blocks
+
+
+def _parse_user(data: dict[str, Any]) -> UserMessage:
+    content = data["message"]["content"]
+    if type(content) is list:
+        return UserMessage(content=_parse_blocks(content, allow_thinking=False))
+    return UserMessage(content=content)
+
+
+def _parse_assistant(data: dict[str, Any]) -> AssistantMessage:
+    return AssistantMessage(
+        content=_parse_blocks(data["message"]["content"], allow_thinking=True),
+        model=data["message"]["model"],
+    )
+
+
+def _parse_system(data: dict[str, Any]) -> SystemMessage:
+    return SystemMessage(subtype=data["subtype"], data=data)
+
+
+def _parse_result(data: dict[str, Any]) -> ResultMessage:
+    return ResultMessage(
+        subtype=data["subtype"],
+        duration_ms=data["duration_ms"],
+        duration_api_ms=data["duration_api_ms"],
+        is_error=data["is_error"],
+        num_turns=data["num_turns"],
+        session_id=data["session_id"],
+        total_cost_usd=data.get("total_cost_usd"),
+        usage=data.get("usage"),
+        result=data.get("result"),
+    )
+
+
+# Message parsers keyed by the message's "type" field
+_MESSAGE_PARSERS: dict[str, Callable[[dict[str, Any]], Message]] = {
+    "user": _parse_user,
+    "assistant": _parse_assistant,
+    "system": _parse_system,
+    "result": _parse_result,
+}
+
+
 def parse_message(data: dict[str, Any]) -> Message:
     """
     Parse message from CLI output into typed Message objects.
@@ -43,107 +118,15 @@ def parse_message(data: dict[str, Any]) -> Message:
     if not message_type:
         raise MessageParseError("Message missing 'type' field", data)
 
-    match message_type:
-        case "user":
-            try:
-                if isinstance(data["message"]["content"], list):
-                    user_content_blocks: list[ContentBlock] = []
-                    for block in data["message"]["content"]:
-                        match block["type"]:
-                            case "text":
-                                user_content_blocks.append(
-                                    TextBlock(text=block["text"])
-                                )
-                            case "tool_use":
-                                user_content_blocks.append(
-                                    ToolUseBlock(
-                                        id=block["id"],
-                                        name=block["name"],
-                                        input=block["input"],
-                                    )
-                                )
-                            case "tool_result":
-                                user_content_blocks.append(
-                                    ToolResultBlock(
-                                        tool_use_id=block["tool_use_id"],
-                                        content=block.get("content"),
-                                        is_error=block.get("is_error"),
-                                    )
-                                )
-                    return UserMessage(content=user_content_blocks)
-                return UserMessage(content=data["message"]["content"])
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in user message: {e}", data
-                ) from e
-
-        case "assistant":
-            try:
-                content_blocks: list[ContentBlock] = []
-                for block in data["message"]["content"]:
-                    match block["type"]:
-                        case "text":
-                            content_blocks.append(TextBlock(text=block["text"]))
-                        case "thinking":
-                            content_blocks.append(
-                                ThinkingBlock(
-                                    thinking=block["thinking"],
-                                    signature=block["signature"],
-                                )
-                            )
-                        case "tool_use":
-                            content_blocks.append(
-                                ToolUseBlock(
-                                    id=block["id"],
-                                    name=block["name"],
-                                    input=block["input"],
-                                )
-                            )
-                        case "tool_result":
-                            content_blocks.append(
-                                ToolResultBlock(
-                                    tool_use_id=block["tool_use_id"],
-                                    content=block.get("content"),
-                                    is_error=block.get("is_error"),
-                                )
-                            )
-
-                return AssistantMessage(
-                    content=content_blocks, model=data["message"]["model"]
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in assistant message: {e}", data
-                ) from e
-
-        case "system":
-            try:
-                return SystemMessage(
-                    subtype=data["subtype"],
-                    data=data,
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in system message: {e}", data
-                ) from e
-
-        case "result":
-            try:
-                return ResultMessage(
-                    subtype=data["subtype"],
-                    duration_ms=data["duration_ms"],
-                    duration_api_ms=data["duration_api_ms"],
-                    is_error=data["is_error"],
-                    num_turns=data["num_turns"],
-                    session_id=data["session_id"],
-                    total_cost_usd=data.get("total_cost_usd"),
-                    usage=data.get("usage"),
-                    result=data.get("result"),
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in result message: {e}", data
-                ) from e
+    parser = (
+        _MESSAGE_PARSERS.get(message_type) if isinstance(message_type, str) else None
+    )
+    if parser is None:
+        raise MessageParseError(f"Unknown message type: {message_type}", data)
 
-        case _:
-            raise MessageParseError(f"Unknown message type: {message_type}", data)
+    try:
+        return parser(data)
+    except KeyError as e:
+        raise MessageParseError(
+            f"Missing required field in {message_type} message: {e}", data
+        ) from e
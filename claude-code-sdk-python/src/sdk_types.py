@@ -40,14 +40,14 @@ McpServerConfig = McpStdioServerConfig | McpSSEServerConfig | McpHttpServerConfi
 
 
 # Content block types
-@dataclass
+@dataclass(slots=True)
 class TextBlock:
     """Text content block."""
 
     text: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ThinkingBlock:
     """Thinking content block."""
 
@@ -55,7 +55,7 @@ class ThinkingBlock:
     signature: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolUseBlock:
     """Tool use content block."""
 
@@ -64,7 +64,7 @@ class ToolUseBlock:
     input: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResultBlock:
     """Tool result content block."""
 
@@ -77,14 +77,14 @@ ContentBlock = TextBlock | ThinkingBlock | ToolUseBlock | ToolResultBlock
 
 
 # Message types
-@dataclass
+@dataclass(slots=True)
 class UserMessage:
     """User message."""
 
     content: str | list[ContentBlock]
 
 
-@dataclass
+@dataclass(slots=True)
 class AssistantMessage:
     """Assistant message with content blocks."""
 
@@ -92,7 +92,7 @@ class AssistantMessage:
     model: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemMessage:
     """System message with metadata."""
 
@@ -100,7 +100,7 @@ class SystemMessage:
     data: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class ResultMessage:
     """Result message with cost and usage information."""
 
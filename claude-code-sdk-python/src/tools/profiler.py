@@ -2,70 +2,155 @@
 Performance profiler para Claude Code SDK.
 """
 
+import os
 import time
 import asyncio
-from typing import Dict, List, Any
-from collections import defaultdict
+import contextvars
+import functools
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping
+
+
+@dataclass(slots=True)
+class _TimingStats:
+    """Agregados acumulados de uma operação (sem guardar cada amostra)."""
+
+    count: int
+    total: float
+    min: float
+    max: float
+
+
+# Timers em andamento por contexto, indexados pelo profiler. Os dicts nunca
+# são alterados no lugar (copy-on-write): uma task filha herda o snapshot do
+# pai, mas cada set() vale só para o próprio contexto, então tasks
+# concorrentes não sobrescrevem o timer uma da outra. Fica no nível do módulo
+# porque um ContextVar por instância ficaria preso em todo Context que o setou.
+_active_timers: contextvars.ContextVar[
+    Mapping["AsyncProfiler", Mapping[str, int]]
+] = contextvars.ContextVar("profiler_active_timers", default=MappingProxyType({}))
+
 
 class AsyncProfiler:
     """Profiler simples para operações async."""
     
     def __init__(self):
-        self.timings = defaultdict(list)
-        self.active_timers = {}
+        self.stats: Dict[str, _TimingStats] = {}
+        self._lock = threading.Lock()
+        
+    @property
+    def active_timers(self) -> Mapping[str, int]:
+        """Timers iniciados no contexto (task) atual (somente leitura)."""
+        return MappingProxyType(_active_timers.get().get(self, {}))
+        
+    def _set_active_timers(self, timers: Mapping[str, int]):
+        """Publica um novo snapshot dos timers deste profiler no contexto atual."""
+        all_timers = {**_active_timers.get()}
+        if timers:
+            all_timers[self] = timers
+        else:
+            # Sem timers pendentes, não mantém referência ao profiler
+            all_timers.pop(self, None)
+        _active_timers.set(all_timers)
         
     def start_timer(self, operation: str):
         """Inicia timer para operação."""
-        self.active_timers[operation] = time.time()
+        timers = _active_timers.get().get(self, {})
+        self._set_active_timers({**timers, operation: time.perf_counter_ns()})
         
     def end_timer(self, operation: str):
         """Finaliza timer e registra resultado."""
-        if operation in self.active_timers:
-            duration = time.time() - self.active_timers[operation]
-            self.timings[operation].append(duration)
-            del self.active_timers[operation]
-            return duration
-        return 0
+        timers = _active_timers.get().get(self, {})
+        start = timers.get(operation)
+        if start is None:
+            return 0
+        self._set_active_timers({k: v for k, v in timers.items() if k != operation})
+        # Subtração inteira em ns; converte para segundos só no fim
+        duration = (time.perf_counter_ns() - start) / 1e9
+        with self._lock:
+            rec = self.stats.get(operation)
+            if rec is None:
+                self.stats[operation] = _TimingStats(1, duration, duration, duration)
+            else:
+                rec.count += 1
+                rec.total += duration
+                if duration < rec.min:
+                    rec.min = duration
+                if duration > rec.max:
+                    rec.max = duration
+        return duration
+    
+    def reset(self):
+        """Limpa as métricas e os timers pendentes no contexto atual."""
+        with self._lock:
+            self.stats.clear()
+        self._set_active_timers({})
     
     def get_stats(self, operation: str) -> Dict[str, float]:
         """Obtém estatísticas de uma operação."""
-        if operation not in self.timings:
-            return {}
+        # Copia os campos sob o lock para não ler um registro no meio de um update
+        with self._lock:
+            rec = self.stats.get(operation)
+            if rec is None:
+                return {}
+            count, total, min_, max_ = rec.count, rec.total, rec.min, rec.max
             
-        times = self.timings[operation]
         return {
-            "count": len(times),
-            "total": sum(times),
-            "average": sum(times) / len(times),
-            "min": min(times),
-            "max": max(times)
+            "count": count,
+            "total": total,
+            "average": total / count,
+            "min": min_,
+            "max": max_
         }
     
     def report(self) -> str:
         """Gera relatório de performance."""
         report = ["🔍 PERFORMANCE REPORT", "=" * 25]
         
-        for operation in self.timings:
-            stats = self.get_stats(operation)
-            report.append(f"\n📊 {operation}:")
-            report.append(f"   Calls: {stats['count']}")
-            report.append(f"   Avg: {stats['average']:.4f}s")
-            report.append(f"   Min: {stats['min']:.4f}s")
-            report.append(f"   Max: {stats['max']:.4f}s")
+        # Snapshot dos agregados sob o lock; a formatação fica fora dele
+        with self._lock:
+            snapshot = [
+                (operation, rec.count, rec.total, rec.min, rec.max)
+                for operation, rec in self.stats.items()
+            ]
+        
+        for operation, count, total, min_, max_ in snapshot:
+            report.append(
+                f"\n📊 {operation}:\n"
+                f"   Calls: {count}\n"
+                f"   Avg: {total / count:.4f}s\n"
+                f"   Min: {min_:.4f}s\n"
+                f"   Max: {max_:.4f}s"
+            )
             
         return "\n".join(report)
 
 # Global profiler instance
 _global_profiler = AsyncProfiler()
 
+# Lido uma vez no import: com o profiling desligado, profile_query não
+# embrulha a função e o custo em runtime é zero
+_ENABLED = os.environ.get("CLAUDE_SDK_PROFILE") == "1"
+
 def profile_query(operation_name: str = "query"):
-    """Decorator para profilear queries."""
+    """
+    Decorator para profilear queries.
+
+    Opt-in: só mede quando CLAUDE_SDK_PROFILE=1 já está definido no import de
+    src.tools.profiler. Caso contrário devolve a própria função, sem registrar
+    nada no profiler global (report() fica vazio).
+    """
     def decorator(func):
+        if not _ENABLED:
+            return func
+
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             _global_profiler.start_timer(operation_name)
             try:
-                result = await func(*args, **kwargs)
-                return result
+                return await func(*args, **kwargs)
             finally:
                 _global_profiler.end_timer(operation_name)
         return wrapper
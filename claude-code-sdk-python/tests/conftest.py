@@ -3,6 +3,8 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Adiciona o diretório pai ao PYTHONPATH para permitir imports de src
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -10,4 +12,10 @@ sys.path.insert(0, str(project_root))
 # Configuração para pytest
 pytest_plugins = []
 
-# Fixtures compartilhadas podem ser adicionadas aqui
\ No newline at end of file
+from src.sdk_types import ClaudeCodeOptions
+
+
+@pytest.fixture(scope="session")
+def default_options():
+    """Opções padrão compartilhadas; nenhum teste deve modificá-las."""
+    return ClaudeCodeOptions()
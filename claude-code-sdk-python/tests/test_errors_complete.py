@@ -11,117 +11,123 @@ from src._errors import (
 )
 
 
-class TestClaudeSDKErrorComplete:
-    """Complete tests for ClaudeSDKError base class."""
-
-    def test_sdk_error_with_message(self):
-        """Test ClaudeSDKError with message."""
-        error = ClaudeSDKError("Test error message")
-        assert str(error) == "Test error message"
-        assert error.args == ("Test error message",)
-
-    def test_sdk_error_inheritance(self):
-        """Test that ClaudeSDKError inherits from Exception."""
-        error = ClaudeSDKError("Test")
-        assert isinstance(error, Exception)
-
-    def test_sdk_error_empty_message(self):
-        """Test ClaudeSDKError with empty message."""
-        error = ClaudeSDKError("")
-        assert str(error) == ""
-
-    def test_sdk_error_with_special_characters(self):
-        """Test ClaudeSDKError with special characters."""
-        msg = "Error: ñ, ü, 中文, 🚀, \n\t"
-        error = ClaudeSDKError(msg)
-        assert str(error) == msg
-
-
-class TestCLINotFoundErrorComplete:
-    """Complete tests for CLINotFoundError."""
-
-    def test_cli_not_found_default(self):
-        """Test CLINotFoundError with default message."""
-        error = CLINotFoundError()
-        assert "Claude Code not found" in str(error)
-
-    def test_cli_not_found_custom_message(self):
-        """Test CLINotFoundError with custom message."""
-        msg = "Custom CLI not found at /usr/bin/claude"
-        error = CLINotFoundError(msg)
-        assert str(error) == msg
-
-    def test_cli_not_found_inheritance(self):
-        """Test CLINotFoundError inheritance chain."""
-        error = CLINotFoundError()
-        assert isinstance(error, ClaudeSDKError)
-        assert isinstance(error, Exception)
-
-
-class TestCLIConnectionErrorComplete:
-    """Complete tests for CLIConnectionError."""
-
-    def test_cli_connection_default(self):
-        """Test CLIConnectionError with default message."""
-        error = CLIConnectionError()
-        # CLIConnectionError doesn't have a default message, just test instantiation
-        assert isinstance(error, CLIConnectionError)
-
-    def test_cli_connection_custom_message(self):
-        """Test CLIConnectionError with custom message."""
-        msg = "Connection timeout after 30 seconds"
-        error = CLIConnectionError(msg)
-        assert str(error) == msg
-
-    def test_cli_connection_inheritance(self):
-        """Test CLIConnectionError inheritance."""
-        error = CLIConnectionError()
-        assert isinstance(error, ClaudeSDKError)
-
-
-class TestProcessErrorComplete:
-    """Complete tests for ProcessError."""
-
-    def test_process_error_basic(self):
-        """Test ProcessError with basic parameters."""
-        error = ProcessError("Process failed", exit_code=1)
-        assert "Process failed" in str(error)
-        assert "exit code: 1" in str(error)
-        assert error.exit_code == 1
-        assert error.stderr is None
-
-    def test_process_error_with_stderr(self):
-        """Test ProcessError with stderr output."""
-        stderr_output = "Error: Invalid argument\nUsage: command [options]"
-        error = ProcessError("Command failed", exit_code=2, stderr=stderr_output)
-        assert "Command failed" in str(error)
-        assert "exit code: 2" in str(error)
-        assert "Error output:" in str(error)
-        assert error.exit_code == 2
-        assert error.stderr == stderr_output
-
-    def test_process_error_zero_exit_code(self):
-        """Test ProcessError with zero exit code."""
-        error = ProcessError("Unexpected termination", exit_code=0)
-        assert error.exit_code == 0
-
-    def test_process_error_negative_exit_code(self):
-        """Test ProcessError with negative exit code (signal)."""
-        error = ProcessError("Killed by signal", exit_code=-9)
-        assert error.exit_code == -9
-
-    def test_process_error_inheritance(self):
-        """Test ProcessError inheritance."""
-        error = ProcessError("Test", exit_code=1)
-        assert isinstance(error, ClaudeSDKError)
-
-    def test_process_error_attributes_access(self):
-        """Test accessing ProcessError attributes."""
-        error = ProcessError("Failed", exit_code=127, stderr="Command not found")
-        assert hasattr(error, "exit_code")
-        assert hasattr(error, "stderr")
-        assert error.exit_code == 127
-        assert error.stderr == "Command not found"
+@pytest.mark.parametrize(
+    "cls,args,kwargs,expected,attrs",
+    [
+        pytest.param(
+            ClaudeSDKError,
+            ("Test error message",),
+            {},
+            "Test error message",
+            {"args": ("Test error message",)},
+            id="sdk-message",
+        ),
+        pytest.param(ClaudeSDKError, ("",), {}, "", {"args": ("",)}, id="sdk-empty"),
+        pytest.param(
+            ClaudeSDKError,
+            ("Error: ñ, ü, 中文, 🚀, \n\t",),
+            {},
+            "Error: ñ, ü, 中文, 🚀, \n\t",
+            {"args": ("Error: ñ, ü, 中文, 🚀, \n\t",)},
+            id="sdk-special-characters",
+        ),
+        pytest.param(
+            CLINotFoundError,
+            (),
+            {},
+            "Claude Code not found",
+            {"args": ("Claude Code not found",)},
+            id="not-found-default",
+        ),
+        pytest.param(
+            CLINotFoundError,
+            ("Custom CLI not found at /usr/bin/claude",),
+            {},
+            "Custom CLI not found at /usr/bin/claude",
+            {"args": ("Custom CLI not found at /usr/bin/claude",)},
+            id="not-found-custom",
+        ),
+        # CLIConnectionError has no default message
+        pytest.param(
+            CLIConnectionError, (), {}, "", {"args": ()}, id="connection-default"
+        ),
+        pytest.param(
+            CLIConnectionError,
+            ("Connection timeout after 30 seconds",),
+            {},
+            "Connection timeout after 30 seconds",
+            {"args": ("Connection timeout after 30 seconds",)},
+            id="connection-custom",
+        ),
+        pytest.param(
+            ProcessError,
+            ("Process failed",),
+            {"exit_code": 1},
+            "Process failed (exit code: 1)",
+            {"exit_code": 1, "stderr": None},
+            id="process-basic",
+        ),
+        pytest.param(
+            ProcessError,
+            ("Command failed",),
+            {
+                "exit_code": 2,
+                "stderr": "Error: Invalid argument\nUsage: command [options]",
+            },
+            "Command failed (exit code: 2)\n"
+            "Error output: Error: Invalid argument\nUsage: command [options]",
+            {
+                "exit_code": 2,
+                "stderr": "Error: Invalid argument\nUsage: command [options]",
+            },
+            id="process-stderr",
+        ),
+        pytest.param(
+            ProcessError,
+            ("Unexpected termination",),
+            {"exit_code": 0},
+            "Unexpected termination (exit code: 0)",
+            {"exit_code": 0},
+            id="process-zero-exit",
+        ),
+        pytest.param(
+            ProcessError,
+            ("Killed by signal",),
+            {"exit_code": -9},
+            "Killed by signal (exit code: -9)",
+            {"exit_code": -9},
+            id="process-signal-exit",
+        ),
+        pytest.param(
+            ProcessError,
+            ("Failed",),
+            {"exit_code": 127, "stderr": "Command not found"},
+            "Failed (exit code: 127)\nError output: Command not found",
+            {"exit_code": 127, "stderr": "Command not found"},
+            id="process-attributes",
+        ),
+    ],
+)
+def test_error_message(cls, args, kwargs, expected, attrs):
+    """Test the message and attributes of each constructed error."""
+    error = cls(*args, **kwargs)
+    assert isinstance(error, cls)
+    assert str(error) == expected
+    assert {name: getattr(error, name) for name in attrs} == attrs
+
+
+@pytest.mark.parametrize(
+    "cls,base",
+    [
+        pytest.param(ClaudeSDKError, Exception, id="sdk"),
+        pytest.param(CLINotFoundError, ClaudeSDKError, id="not-found"),
+        pytest.param(CLIConnectionError, ClaudeSDKError, id="connection"),
+        pytest.param(ProcessError, ClaudeSDKError, id="process"),
+    ],
+)
+def test_error_inheritance(cls, base):
+    """Test that each error type derives from its expected base."""
+    assert issubclass(cls, base)
 
 
 class TestCLIJSONDecodeErrorComplete:
@@ -155,10 +161,8 @@ class TestCLIJSONDecodeErrorComplete:
         """Test accessing original_error attribute."""
         original = RuntimeError("Original error")
         error = CLIJSONDecodeError("Line content here", original)
-        assert hasattr(error, "original_error")
-        assert hasattr(error, "line")
-        assert error.original_error is original
         assert error.line == "Line content here"
+        assert error.original_error is original
 
 
 class TestMessageParseErrorComplete:
@@ -207,7 +211,6 @@ class TestMessageParseErrorComplete:
         """Test accessing data attribute."""
         data = {"key": "value"}
         error = MessageParseError("Error", data)
-        assert hasattr(error, "data")
         assert error.data is data
 
 
@@ -230,23 +233,20 @@ class TestErrorRaisingAndCatching:
         except ClaudeSDKError:
             pytest.fail("Should catch ProcessError specifically")
 
-    def test_catch_base_error(self):
-        """Test catching base ClaudeSDKError for all subtypes."""
-        errors = [
-            CLINotFoundError("Not found"),
-            CLIConnectionError("Connection failed"),
-            ProcessError("Process error", exit_code=1),
-            CLIJSONDecodeError("JSON line", ValueError()),
-            MessageParseError("Parse error", {})
-        ]
-        
-        for error in errors:
-            try:
-                raise error
-            except ClaudeSDKError as e:
-                assert isinstance(e, ClaudeSDKError)
-            except Exception:
-                pytest.fail(f"Should catch {type(error).__name__} as ClaudeSDKError")
+    @pytest.mark.parametrize(
+        "error",
+        [
+            pytest.param(CLINotFoundError("Not found"), id="not-found"),
+            pytest.param(CLIConnectionError("Connection failed"), id="connection"),
+            pytest.param(ProcessError("Process error", exit_code=1), id="process"),
+            pytest.param(CLIJSONDecodeError("JSON line", ValueError()), id="json-decode"),
+            pytest.param(MessageParseError("Parse error", {}), id="message-parse"),
+        ],
+    )
+    def test_catch_base_error(self, error):
+        """Test catching base ClaudeSDKError for each subtype."""
+        with pytest.raises(ClaudeSDKError):
+            raise error
 
     def test_error_chain_with_cause(self):
         """Test error chaining with __cause__."""
@@ -2,10 +2,12 @@
 
 from collections.abc import AsyncIterator
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
+import anyio
 import pytest
 
+from src._internal import client as _client_mod
 from src._internal.client import InternalClient
 from src.sdk_types import (
     AssistantMessage,
@@ -17,6 +19,59 @@ from src.sdk_types import (
 )
 
 
+_USER_HELLO = UserMessage(content="Hello")
+_ASSIST_HI = AssistantMessage(content=[TextBlock(text="Hi there")], model="claude")
+_RESULT_OK = ResultMessage(
+    subtype="success",
+    duration_ms=100,
+    duration_api_ms=80,
+    is_error=False,
+    num_turns=1,
+    session_id="test",
+)
+_USER_TEST = UserMessage(content="test")
+
+# parse_message results for ten messages, cycling user/assistant/system by index
+_MULTI_MSGS = tuple(
+    UserMessage(content=f"User {i}")
+    if i % 3 == 0
+    else AssistantMessage(content=[TextBlock(text=f"Assistant {i}")], model="claude")
+    if i % 3 == 1
+    else SystemMessage(subtype="info", data={"index": i})
+    for i in range(10)
+)
+
+
+@pytest.fixture(autouse=True)
+def mock_transport_class(monkeypatch):
+    """Replace SubprocessCLITransport with a class mock; tests set return_value."""
+    transport_class = MagicMock()
+    monkeypatch.setattr(_client_mod, "SubprocessCLITransport", transport_class)
+    return transport_class
+
+
+@pytest.fixture
+def mock_parse(monkeypatch):
+    """Replace parse_message in the client module with a MagicMock."""
+    parse = MagicMock()
+    monkeypatch.setattr(_client_mod, "parse_message", parse)
+    return parse
+
+
+def make_transport(msgs, raise_after=None):
+    """Build a transport mock that yields msgs, raising after raise_after of them."""
+    transport = AsyncMock()
+
+    async def receive_messages():
+        for index, msg in enumerate(msgs):
+            if index == raise_after:
+                raise RuntimeError("Test error")
+            yield msg
+
+    transport.receive_messages = receive_messages
+    return transport
+
+
 class TestInternalClientInitialization:
     """Test InternalClient initialization."""
 
@@ -32,36 +87,18 @@ class TestInternalClientInitialization:
 class TestProcessQuery:
     """Test process_query method."""
 
-    @pytest.mark.asyncio
-    @patch("src._internal.client.SubprocessCLITransport")
-    @patch("src._internal.client.parse_message")
     async def test_process_query_with_string_prompt(self, mock_parse, mock_transport_class):
         """Test process_query with string prompt."""
-        # Setup transport mock
-        mock_transport = AsyncMock()
-        mock_transport_class.return_value = mock_transport
-        
-        # Mock receive_messages
-        async def mock_receive():
-            yield {"type": "user", "content": "Hello"}
-            yield {"type": "assistant", "content": "Hi there"}
-            yield {"type": "result", "subtype": "success"}
-        
-        mock_transport.receive_messages = mock_receive
+        mock_transport = mock_transport_class.return_value = make_transport(
+            [
+                {"type": "user", "content": "Hello"},
+                {"type": "assistant", "content": "Hi there"},
+                {"type": "result", "subtype": "success"},
+            ]
+        )
         
         # Mock parse_message
-        mock_parse.side_effect = [
-            UserMessage(content="Hello"),
-            AssistantMessage(content=[TextBlock(text="Hi there")], model="claude"),
-            ResultMessage(
-                subtype="success",
-                duration_ms=100,
-                duration_api_ms=80,
-                is_error=False,
-                num_turns=1,
-                session_id="test"
-            )
-        ]
+        mock_parse.side_effect = [_USER_HELLO, _ASSIST_HI, _RESULT_OK]
         
         # Execute
         client = InternalClient()
@@ -88,20 +125,13 @@ class TestProcessQuery:
         assert mock_transport.connect.called
         assert mock_transport.disconnect.called
 
-    @pytest.mark.asyncio
-    @patch("src._internal.client.SubprocessCLITransport")
-    @patch("src._internal.client.parse_message")
-    async def test_process_query_with_async_iterable(self, mock_parse, mock_transport_class):
+    async def test_process_query_with_async_iterable(
+        self, mock_parse, mock_transport_class, default_options
+    ):
         """Test process_query with async iterable prompt."""
-        # Setup transport mock
-        mock_transport = AsyncMock()
-        mock_transport_class.return_value = mock_transport
-        
-        # Mock receive_messages
-        async def mock_receive():
-            yield {"type": "assistant", "content": "Response"}
-        
-        mock_transport.receive_messages = mock_receive
+        mock_transport_class.return_value = make_transport(
+            [{"type": "assistant", "content": "Response"}]
+        )
         
         # Mock parse_message
         mock_parse.return_value = AssistantMessage(
@@ -116,7 +146,7 @@ class TestProcessQuery:
         
         # Execute
         client = InternalClient()
-        options = ClaudeCodeOptions()
+        options = default_options
         
         messages = []
         async for msg in client.process_query(prompt_stream(), options):
@@ -128,28 +158,22 @@ class TestProcessQuery:
         
         # Verify transport was created with async iterable
         call_args = mock_transport_class.call_args
-        assert hasattr(call_args[1]["prompt"], "__aiter__")
+        assert hasattr(call_args.kwargs["prompt"], "__aiter__")
 
-    @pytest.mark.asyncio
-    @patch("src._internal.client.parse_message")
-    async def test_process_query_with_custom_transport(self, mock_parse):
+    async def test_process_query_with_custom_transport(
+        self, mock_parse, mock_transport_class, default_options
+    ):
         """Test process_query with custom transport provided."""
-        # Create custom transport mock
-        custom_transport = AsyncMock()
-        
-        # Mock receive_messages
-        async def mock_receive():
-            yield {"type": "system", "subtype": "info", "data": "test"}
-        
-        custom_transport.receive_messages = mock_receive
+        custom_transport = make_transport(
+            [{"type": "system", "subtype": "info", "data": "test"}]
+        )
         
         # Mock parse_message
-        from src.sdk_types import SystemMessage
         mock_parse.return_value = SystemMessage(subtype="info", data={"data": "test"})
         
         # Execute
         client = InternalClient()
-        options = ClaudeCodeOptions()
+        options = default_options
         
         messages = []
         async for msg in client.process_query("test", options, transport=custom_transport):
@@ -164,95 +188,73 @@ class TestProcessQuery:
         assert custom_transport.disconnect.called
         
         # Verify SubprocessCLITransport was NOT created
-        with patch("src._internal.client.SubprocessCLITransport") as mock_transport_class:
-            mock_transport_class.assert_not_called()
-
-    @pytest.mark.asyncio
-    @patch("src._internal.client.SubprocessCLITransport")
-    @patch("src._internal.client.parse_message")
-    async def test_process_query_disconnect_on_error(self, mock_parse, mock_transport_class):
-        """Test that transport is disconnected even on error."""
-        # Setup transport mock
-        mock_transport = AsyncMock()
-        mock_transport_class.return_value = mock_transport
-        
-        # Mock receive_messages to raise error
-        async def mock_receive():
-            yield {"type": "message"}
-            raise RuntimeError("Test error")
-        
-        mock_transport.receive_messages = mock_receive
-        
-        # Mock parse_message to raise on first call
+        mock_transport_class.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "msgs,raise_at,expected_count",
+        [
+            pytest.param(
+                [{"type": "message1"}, {"type": "message2"}, {"type": "message3"}],
+                None,
+                3,
+                id="full-iteration",
+            ),
+            pytest.param(
+                [{"type": "message1"}, {"type": "message2"}],
+                1,
+                1,
+                id="error",
+            ),
+        ],
+    )
+    async def test_process_query_disconnects_transport(
+        self,
+        mock_parse,
+        mock_transport_class,
+        default_options,
+        msgs,
+        raise_at,
+        expected_count,
+    ):
+        """Test that transport is disconnected after iteration, even on error."""
+        mock_transport = mock_transport_class.return_value = make_transport(
+            msgs, raise_at
+        )
+        mock_parse.side_effect = lambda data: UserMessage(content=data["type"])
+
+        client = InternalClient()
+        messages = []
+        if raise_at is None:
+            async for msg in client.process_query("test", default_options):
+                messages.append(msg)
+        else:
+            with pytest.raises(RuntimeError, match="Test error"):
+                async for msg in client.process_query("test", default_options):
+                    messages.append(msg)
+
+        assert len(messages) == expected_count
+        mock_transport.connect.assert_awaited_once()
+        mock_transport.disconnect.assert_awaited_once()
+
+    async def test_process_query_disconnects_on_parse_error(
+        self, mock_parse, mock_transport_class, default_options
+    ):
+        """Test that transport is disconnected when parse_message raises."""
+        mock_transport = mock_transport_class.return_value = make_transport(
+            [{"type": "message"}]
+        )
         mock_parse.side_effect = RuntimeError("Parse error")
-        
-        # Execute
+
         client = InternalClient()
-        options = ClaudeCodeOptions()
-        
-        with pytest.raises(RuntimeError) as exc_info:
-            async for _ in client.process_query("test", options):
+        with pytest.raises(RuntimeError, match="Parse error"):
+            async for _ in client.process_query("test", default_options):
                 pass
-        
-        assert "Parse error" in str(exc_info.value)
-        
-        # Verify transport was still disconnected
-        assert mock_transport.connect.called
-        assert mock_transport.disconnect.called
 
-    @pytest.mark.asyncio
-    @patch("src._internal.client.SubprocessCLITransport")
-    @patch("src._internal.client.parse_message")
-    async def test_process_query_full_iteration(self, mock_parse, mock_transport_class):
-        """Test that transport is disconnected after full iteration."""
-        # Setup transport mock
-        mock_transport = AsyncMock()
-        mock_transport_class.return_value = mock_transport
-        
-        # Mock receive_messages
-        async def mock_receive():
-            yield {"type": "message1"}
-            yield {"type": "message2"}
-            yield {"type": "message3"}
-        
-        mock_transport.receive_messages = mock_receive
-        
-        # Mock parse_message
-        mock_parse.side_effect = [
-            UserMessage(content="1"),
-            UserMessage(content="2"),
-            UserMessage(content="3"),
-        ]
-        
-        # Execute - consume all messages
-        client = InternalClient()
-        options = ClaudeCodeOptions()
-        
-        messages = []
-        async for msg in client.process_query("test", options):
-            messages.append(msg)
-        
-        # Verify all messages were received
-        assert len(messages) == 3
-        
-        # Verify transport was connected and disconnected
-        assert mock_transport.connect.called
-        assert mock_transport.disconnect.called
+        mock_transport.disconnect.assert_awaited_once()
 
-    @pytest.mark.asyncio
-    @patch("src._internal.client.SubprocessCLITransport")
-    async def test_process_query_with_options_passed_to_transport(self, mock_transport_class):
+    def test_process_query_with_options_passed_to_transport(self, mock_transport_class):
         """Test that options are correctly passed to transport."""
-        # Setup transport mock
-        mock_transport = AsyncMock()
-        mock_transport_class.return_value = mock_transport
-        
-        # Mock empty receive
-        async def mock_receive():
-            return
-            yield  # Empty generator
-        
-        mock_transport.receive_messages = mock_receive
+        mock_transport_class.return_value = make_transport([])
         
         # Create options with specific values
         options = ClaudeCodeOptions(
@@ -264,56 +266,38 @@ class TestProcessQuery:
             permission_mode="auto"
         )
         
-        # Execute
+        # Execute; no messages are yielded, so drive the generator directly
         client = InternalClient()
-        
-        messages = []
-        async for msg in client.process_query("test", options):
-            messages.append(msg)
+
+        async def _test():
+            async for _ in client.process_query("test", options):
+                pass
+
+        anyio.run(_test)
         
         # Verify options were passed to transport
         mock_transport_class.assert_called_once()
         call_args = mock_transport_class.call_args
         
-        assert call_args[1]["options"] is options
-        assert call_args[1]["options"].model == "claude-3-opus"
-        assert call_args[1]["options"].max_turns == 10
-        assert call_args[1]["close_stdin_after_prompt"] is True
+        assert call_args.kwargs["options"] is options
+        assert call_args.kwargs["options"].model == "claude-3-opus"
+        assert call_args.kwargs["options"].max_turns == 10
+        assert call_args.kwargs["close_stdin_after_prompt"] is True
 
-    @pytest.mark.asyncio
-    @patch("src._internal.client.SubprocessCLITransport")
-    @patch("src._internal.client.parse_message")
-    async def test_process_query_multiple_messages_yielded(self, mock_parse, mock_transport_class):
+    async def test_process_query_multiple_messages_yielded(
+        self, mock_parse, mock_transport_class, default_options
+    ):
         """Test processing multiple messages in sequence."""
-        # Setup transport mock
-        mock_transport = AsyncMock()
-        mock_transport_class.return_value = mock_transport
-        
-        # Mock receive_messages with many messages
-        async def mock_receive():
-            for i in range(10):
-                yield {"type": f"message_{i}", "index": i}
-        
-        mock_transport.receive_messages = mock_receive
-        
-        # Mock parse_message to return different message types
-        def parse_side_effect(data):
-            index = data["index"]
-            if index % 3 == 0:
-                return UserMessage(content=f"User {index}")
-            elif index % 3 == 1:
-                return AssistantMessage(
-                    content=[TextBlock(text=f"Assistant {index}")],
-                    model="claude"
-                )
-            else:
-                return SystemMessage(subtype="info", data={"index": index})
-        
-        mock_parse.side_effect = parse_side_effect
+        mock_transport_class.return_value = make_transport(
+            [{"type": f"message_{i}", "index": i} for i in range(10)]
+        )
+        
+        # Precomputed mix of user, assistant and system messages
+        mock_parse.side_effect = _MULTI_MSGS
         
         # Execute
         client = InternalClient()
-        options = ClaudeCodeOptions()
+        options = default_options
         
         messages = []
         async for msg in client.process_query("test", options):
@@ -331,8 +315,7 @@ class TestProcessQuery:
         assert len(assistant_msgs) == 3  # indices 1, 4, 7
         assert len(system_msgs) == 3  # indices 2, 5, 8
 
-    @pytest.mark.asyncio
-    async def test_process_query_transport_lifecycle(self):
+    async def test_process_query_transport_lifecycle(self, mock_parse, default_options):
         """Test complete transport lifecycle in process_query."""
         # Create a custom transport to track lifecycle
         class LifecycleTransport:
@@ -357,14 +340,13 @@ class TestProcessQuery:
         
         # Execute
         client = InternalClient()
-        options = ClaudeCodeOptions()
+        options = default_options
         
-        with patch("src._internal.client.parse_message") as mock_parse:
-            mock_parse.return_value = UserMessage(content="test")
-            
-            messages = []
-            async for msg in client.process_query("test", options, transport=transport):
-                messages.append(msg)
+        mock_parse.return_value = _USER_TEST
+
+        messages = []
+        async for msg in client.process_query("test", options, transport=transport):
+            messages.append(msg)
         
         # Verify lifecycle
         assert transport.events == [
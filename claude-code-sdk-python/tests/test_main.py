@@ -14,15 +14,11 @@ Cobre todas as funções principais:
 """
 
 import pytest
-import sys
 import asyncio
-from unittest.mock import Mock, AsyncMock, patch, MagicMock, call
+from collections import namedtuple
+from unittest.mock import patch, MagicMock, call
 from io import StringIO
 import argparse
-from pathlib import Path
-
-# Add src to path to import the module
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from src.__main__ import (
     print_header,
@@ -32,7 +28,8 @@ from src.__main__ import (
     chat_mode,
     run_examples,
     main,
-    run
+    run,
+    _build_parser,
 )
 from src import (
     AssistantMessage,
@@ -42,11 +39,82 @@ from src import (
     ToolResultBlock,
     ResultMessage,
     ClaudeCodeOptions,
-    ClaudeSDKClient,
     __version__
 )
 
 
+_MODEL = "claude-3-5-sonnet-20241022"
+
+async def async_iter(*items):
+    """Gerador assíncrono que produz os itens dados, como o retorno de query()."""
+    for item in items:
+        yield item
+
+
+def scripted_input(*answers):
+    """Substituto de input(): devolve as respostas em ordem e levanta as exceções."""
+    answers = iter(answers)
+    
+    def _input(prompt=""):
+        answer = next(answers)
+        if isinstance(answer, str):
+            return answer
+        raise answer
+    
+    return _input
+
+
+# Saídas esperadas que se repetem entre os testes
+_ATE_LOGO = "👋 Até logo!"
+_INTERROMPIDO = "👋 Interrompido pelo usuário!"
+_ERRO_TESTE = "❌ Erro: Erro teste"
+_EXEMPLOS_CONCLUIDOS = "✅ Exemplos concluídos!"
+
+# Objeto de uso com atributos, como o retornado pela API
+Usage = namedtuple("Usage", "input_tokens output_tokens")
+
+
+def _msg(text):
+    """Cria uma AssistantMessage com um único TextBlock."""
+    return AssistantMessage(content=[TextBlock(text=text)], model=_MODEL)
+
+
+# Mensagens imutáveis reutilizadas pelos casos de TestPrintResponse
+_TEXT_MESSAGE = _msg("Olá mundo!")
+_THINKING_MESSAGE = AssistantMessage(
+    content=[ThinkingBlock(thinking="Pensando...", signature="test")],
+    model=_MODEL,
+)
+_TOOL_USE_MESSAGE = AssistantMessage(
+    content=[ToolUseBlock(id="1", name="read", input={"path": "test.py"})],
+    model=_MODEL,
+)
+_TOOL_RESULT_MESSAGE = AssistantMessage(
+    content=[ToolResultBlock(tool_use_id="1", content="resultado")],
+    model=_MODEL,
+)
+_RESULT_USAGE_OBJECT = ResultMessage(
+    subtype="result",
+    duration_ms=1000,
+    duration_api_ms=800,
+    is_error=False,
+    num_turns=1,
+    session_id="test-session",
+    usage=Usage(input_tokens=100, output_tokens=50),
+    total_cost_usd=0.001234,
+)
+_RESULT_USAGE_DICT = ResultMessage(
+    subtype="result",
+    duration_ms=1000,
+    duration_api_ms=800,
+    is_error=False,
+    num_turns=1,
+    session_id="test-session",
+    usage={"input_tokens": 200, "output_tokens": 75},
+    total_cost_usd=0.005678,
+)
+
+
 class TestPrintHeader:
     """Testes para a função print_header()."""
     
@@ -65,90 +133,39 @@ class TestPrintHeader:
 class TestPrintResponse:
     """Testes para a função print_response()."""
     
-    def test_print_response_with_text(self, capsys):
-        """Testa print_response com TextBlock."""
-        text_block = TextBlock(text="Olá mundo!")
-        message = AssistantMessage(content=[text_block], model="claude-3-5-sonnet-20241022")
-        
-        print_response(message)
-        
-        captured = capsys.readouterr()
-        assert "📝 Claude: Olá mundo!" in captured.out
-    
-    def test_print_response_with_thinking(self, capsys):
-        """Testa print_response com ThinkingBlock."""
-        thinking_block = ThinkingBlock(thinking="Pensando...", signature="test")
-        message = AssistantMessage(content=[thinking_block], model="claude-3-5-sonnet-20241022")
-        
-        print_response(message)
-        
-        captured = capsys.readouterr()
-        # ThinkingBlock não deve ser exibido
-        assert "Pensando..." not in captured.out
-    
-    def test_print_response_with_tool_use(self, capsys):
-        """Testa print_response com ToolUseBlock."""
-        tool_use = ToolUseBlock(id="1", name="read", input={"path": "test.py"})
-        message = AssistantMessage(content=[tool_use], model="claude-3-5-sonnet-20241022")
-        
-        print_response(message)
-        
-        captured = capsys.readouterr()
-        # ToolUseBlock não deve ser exibido diretamente
-        assert "read" not in captured.out
-    
-    def test_print_response_with_tool_result(self, capsys):
-        """Testa print_response com ToolResultBlock."""
-        tool_result = ToolResultBlock(tool_use_id="1", content="resultado")
-        message = AssistantMessage(content=[tool_result], model="claude-3-5-sonnet-20241022")
-        
-        print_response(message)
-        
-        captured = capsys.readouterr()
-        # ToolResultBlock não deve ser exibido diretamente
-        assert "resultado" not in captured.out
-    
-    def test_print_response_with_result_message_usage_object(self, capsys):
-        """Testa print_response com ResultMessage contendo usage como objeto."""
-        usage_mock = Mock()
-        usage_mock.input_tokens = 100
-        usage_mock.output_tokens = 50
-        
-        message = ResultMessage(
-            subtype="result",
-            duration_ms=1000,
-            duration_api_ms=800,
-            is_error=False,
-            num_turns=1,
-            session_id="test-session",
-            usage=usage_mock,
-            total_cost_usd=0.001234
-        )
-        
-        print_response(message)
-        
-        captured = capsys.readouterr()
-        assert "📊 Tokens: 100 entrada, 50 saída" in captured.out
-        assert "💰 Custo: $0.001234" in captured.out
-    
-    def test_print_response_with_result_message_usage_dict(self, capsys):
-        """Testa print_response com ResultMessage contendo usage como dict."""
-        message = ResultMessage(
-            subtype="result",
-            duration_ms=1000,
-            duration_api_ms=800,
-            is_error=False,
-            num_turns=1,
-            session_id="test-session",
-            usage={"input_tokens": 200, "output_tokens": 75},
-            total_cost_usd=0.005678
-        )
-        
+    @pytest.mark.parametrize(
+        "message,expected_substrings,forbidden_substrings",
+        [
+            pytest.param(_TEXT_MESSAGE, ("📝 Claude: Olá mundo!",), (), id="text"),
+            # ThinkingBlock não deve ser exibido
+            pytest.param(_THINKING_MESSAGE, (), ("Pensando...",), id="thinking"),
+            # ToolUseBlock não deve ser exibido diretamente
+            pytest.param(_TOOL_USE_MESSAGE, (), ("read",), id="tool-use"),
+            # ToolResultBlock não deve ser exibido diretamente
+            pytest.param(_TOOL_RESULT_MESSAGE, (), ("resultado",), id="tool-result"),
+            pytest.param(
+                _RESULT_USAGE_OBJECT,
+                ("📊 Tokens: 100 entrada, 50 saída", "💰 Custo: $0.001234"),
+                (),
+                id="result-usage-object",
+            ),
+            pytest.param(
+                _RESULT_USAGE_DICT,
+                ("📊 Tokens: 200 entrada, 75 saída", "💰 Custo: $0.005678"),
+                (),
+                id="result-usage-dict",
+            ),
+        ],
+    )
+    def test_print_response(self, capsys, message, expected_substrings, forbidden_substrings):
+        """Testa print_response com cada tipo de bloco e de ResultMessage."""
         print_response(message)
         
         captured = capsys.readouterr()
-        assert "📊 Tokens: 200 entrada, 75 saída" in captured.out
-        assert "💰 Custo: $0.005678" in captured.out
+        for expected in expected_substrings:
+            assert expected in captured.out
+        for forbidden in forbidden_substrings:
+            assert forbidden not in captured.out
     
     def test_print_response_with_error(self, capsys):
         """Testa print_response com objeto não reconhecido."""
@@ -164,43 +181,28 @@ class TestPrintResponse:
 class TestSingleQuery:
     """Testes para a função single_query()."""
     
-    @pytest.mark.asyncio
-    async def test_single_query_success(self, capsys):
+    async def test_single_query_success(self):
         """Testa single_query com sucesso."""
-        text_block = TextBlock(text="Resposta teste")
-        message = AssistantMessage(content=[text_block], model="claude-3-5-sonnet-20241022")
-        
-        async def async_generator():
-            yield message
-        
         with patch('src.__main__.query') as mock_query:
-            mock_query.return_value = async_generator()
+            mock_query.return_value = async_iter(_msg("Resposta teste"))
             
             result = await single_query("Pergunta teste")
             
             assert result is True
-            captured = capsys.readouterr()
-            assert "🔍 Pergunta: Pergunta teste" in captured.out
-            assert "📝 Claude: Resposta teste" in captured.out
+            mock_query.assert_called_once_with(prompt="Pergunta teste", options=None)
     
-    @pytest.mark.asyncio
-    async def test_single_query_with_options(self, capsys):
+    async def test_single_query_with_options(self):
         """Testa single_query com opções."""
         options = ClaudeCodeOptions()
         options.system_prompt = "System test"
         
-        async def empty_async_generator():
-            if False:  # Never yields
-                yield
-        
         with patch('src.__main__.query') as mock_query:
-            mock_query.return_value = empty_async_generator()
+            mock_query.return_value = async_iter()
             
             await single_query("Pergunta", options)
             
             mock_query.assert_called_once_with(prompt="Pergunta", options=options)
     
-    @pytest.mark.asyncio
     async def test_single_query_with_exception(self, capsys):
         """Testa single_query com exceção."""
         with patch('src.__main__.query') as mock_query:
@@ -210,140 +212,129 @@ class TestSingleQuery:
             
             assert result is False
             captured = capsys.readouterr()
-            assert "❌ Erro: Erro teste" in captured.out
+            assert _ERRO_TESTE in captured.out
 
 
 class TestInteractiveMode:
     """Testes para a função interactive_mode()."""
     
-    @pytest.mark.asyncio
-    async def test_interactive_mode_sair_command(self, capsys):
+    @patch('src.__main__.single_query')
+    async def test_interactive_mode_sair_command(self, mock_single_query, capsys, monkeypatch):
         """Testa comando 'sair' no modo interativo."""
-        with patch('builtins.input', side_effect=["sair"]):
-            with patch('src.__main__.single_query') as mock_single_query:
-                await interactive_mode()
-                
-                mock_single_query.assert_not_called()
-                captured = capsys.readouterr()
-                assert "👋 Até logo!" in captured.out
-    
-    @pytest.mark.asyncio
-    async def test_interactive_mode_exit_command(self, capsys):
+        monkeypatch.setattr("builtins.input", scripted_input("sair"))
+        await interactive_mode()
+        
+        mock_single_query.assert_not_called()
+        captured = capsys.readouterr()
+        assert _ATE_LOGO in captured.out
+    
+    async def test_interactive_mode_exit_command(self, capsys, monkeypatch):
         """Testa comando 'exit' no modo interativo."""
-        with patch('builtins.input', side_effect=["exit"]):
-            await interactive_mode()
-            
-            captured = capsys.readouterr()
-            assert "👋 Até logo!" in captured.out
+        monkeypatch.setattr("builtins.input", scripted_input("exit"))
+        await interactive_mode()
+        
+        captured = capsys.readouterr()
+        assert _ATE_LOGO in captured.out
     
-    @pytest.mark.asyncio
-    async def test_interactive_mode_empty_input(self, capsys):
+    @patch('src.__main__.single_query')
+    async def test_interactive_mode_empty_input(self, mock_single_query, monkeypatch):
         """Testa entrada vazia no modo interativo."""
-        with patch('builtins.input', side_effect=["", "sair"]):
-            with patch('src.__main__.single_query') as mock_single_query:
-                await interactive_mode()
-                
-                mock_single_query.assert_not_called()
-    
-    @pytest.mark.asyncio
-    async def test_interactive_mode_valid_question(self, capsys):
+        monkeypatch.setattr("builtins.input", scripted_input("", "sair"))
+        await interactive_mode()
+        
+        mock_single_query.assert_not_called()
+    
+    @patch('src.__main__.single_query')
+    async def test_interactive_mode_valid_question(self, mock_single_query, monkeypatch):
         """Testa pergunta válida no modo interativo."""
-        with patch('builtins.input', side_effect=["Pergunta teste", "sair"]):
-            with patch('src.__main__.single_query') as mock_single_query:
-                await interactive_mode()
-                
-                mock_single_query.assert_called_once_with("Pergunta teste")
-    
-    @pytest.mark.asyncio
-    async def test_interactive_mode_keyboard_interrupt(self, capsys):
+        monkeypatch.setattr("builtins.input", scripted_input("Pergunta teste", "sair"))
+        await interactive_mode()
+        
+        mock_single_query.assert_called_once_with("Pergunta teste")
+    
+    async def test_interactive_mode_keyboard_interrupt(self, capsys, monkeypatch):
         """Testa KeyboardInterrupt no modo interativo."""
-        with patch('builtins.input', side_effect=KeyboardInterrupt):
-            await interactive_mode()
-            
-            captured = capsys.readouterr()
-            assert "👋 Interrompido pelo usuário!" in captured.out
+        monkeypatch.setattr("builtins.input", scripted_input(KeyboardInterrupt))
+        await interactive_mode()
+        
+        captured = capsys.readouterr()
+        assert _INTERROMPIDO in captured.out
     
-    @pytest.mark.asyncio
-    async def test_interactive_mode_eof_error(self, capsys):
+    async def test_interactive_mode_eof_error(self, capsys, monkeypatch):
         """Testa EOFError no modo interativo."""
-        with patch('builtins.input', side_effect=EOFError):
-            await interactive_mode()
-            
-            captured = capsys.readouterr()
-            assert "👋 Até logo!" in captured.out
+        monkeypatch.setattr("builtins.input", scripted_input(EOFError))
+        await interactive_mode()
+        
+        captured = capsys.readouterr()
+        assert _ATE_LOGO in captured.out
+
+
+class FakeClaudeClient:
+    """ClaudeSDKClient falso: async context manager que registra as queries."""
+    
+    def __init__(self, *responses):
+        self.queries = []
+        self._responses = responses
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+    
+    async def query(self, prompt):
+        self.queries.append(prompt)
+    
+    async def receive_response(self):
+        for message in self._responses:
+            yield message
 
 
 class TestChatMode:
     """Testes para a função chat_mode()."""
     
-    @pytest.mark.asyncio
-    async def test_chat_mode_sair_command(self, capsys):
+    @patch('src.__main__.ClaudeSDKClient')
+    async def test_chat_mode_sair_command(
+        self, mock_client_class, capsys, mock_claude_client, monkeypatch
+    ):
         """Testa comando 'sair' no modo chat."""
-        mock_client = AsyncMock()
-        # Configurar context manager
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
+        monkeypatch.setattr("builtins.input", scripted_input("sair"))
+        mock_client_class.return_value = mock_claude_client
         
-        with patch('builtins.input', side_effect=["sair"]):
-            with patch('src.__main__.ClaudeSDKClient', return_value=mock_client):
-                await chat_mode()
-                
-                captured = capsys.readouterr()
-                assert "👋 Até logo!" in captured.out
-    
-    @pytest.mark.asyncio
-    async def test_chat_mode_valid_message(self, capsys):
-        """Testa mensagem válida no modo chat."""
-        text_block = TextBlock(text="Resposta")
-        response_message = AssistantMessage(content=[text_block], model="claude-3-5-sonnet-20241022")
+        await chat_mode()
         
-        # Criar um mock client que implementa async context manager
-        class MockClient:
-            def __init__(self):
-                self.query_called_with = None
-            
-            async def __aenter__(self):
-                return self
-            
-            async def __aexit__(self, exc_type, exc_val, exc_tb):
-                pass
-            
-            async def query(self, prompt):
-                self.query_called_with = prompt
-            
-            async def receive_response(self):
-                yield response_message
+        captured = capsys.readouterr()
+        assert _ATE_LOGO in captured.out
+    
+    @patch('src.__main__.ClaudeSDKClient')
+    async def test_chat_mode_valid_message(self, mock_client_class, capsys, monkeypatch):
+        """Testa mensagem válida no modo chat."""
+        monkeypatch.setattr("builtins.input", scripted_input("Olá", "sair"))
+        mock_client = mock_client_class.return_value = FakeClaudeClient(_msg("Resposta"))
         
-        mock_client = MockClient()
+        await chat_mode()
         
-        with patch('builtins.input', side_effect=["Olá", "sair"]):
-            with patch('src.__main__.ClaudeSDKClient', return_value=mock_client):
-                await chat_mode()
-                
-                assert mock_client.query_called_with == "Olá"
-                captured = capsys.readouterr()
-                assert "📝 Claude:" in captured.out
-    
-    @pytest.mark.asyncio
-    async def test_chat_mode_keyboard_interrupt(self, capsys):
+        assert mock_client.queries == ["Olá"]
+        captured = capsys.readouterr()
+        assert "📝 Claude:" in captured.out
+    
+    @patch('src.__main__.ClaudeSDKClient')
+    async def test_chat_mode_keyboard_interrupt(
+        self, mock_client_class, capsys, mock_claude_client, monkeypatch
+    ):
         """Testa KeyboardInterrupt no modo chat."""
-        mock_client = AsyncMock()
-        # Configurar context manager
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
+        monkeypatch.setattr("builtins.input", scripted_input(KeyboardInterrupt))
+        mock_client_class.return_value = mock_claude_client
+        
+        await chat_mode()
         
-        with patch('builtins.input', side_effect=KeyboardInterrupt):
-            with patch('src.__main__.ClaudeSDKClient', return_value=mock_client):
-                await chat_mode()
-                
-                captured = capsys.readouterr()
-                assert "👋 Interrompido pelo usuário!" in captured.out
+        captured = capsys.readouterr()
+        assert _INTERROMPIDO in captured.out
 
 
 class TestRunExamples:
     """Testes para a função run_examples()."""
     
-    @pytest.mark.asyncio
     async def test_run_examples_all_success(self, capsys):
         """Testa execução de exemplos com sucesso."""
         with patch('src.__main__.single_query', return_value=True) as mock_single_query:
@@ -358,9 +349,8 @@ class TestRunExamples:
             assert any("capital do Brasil" in str(call) for call in calls)
             
             captured = capsys.readouterr()
-            assert "✅ Exemplos concluídos!" in captured.out
+            assert _EXEMPLOS_CONCLUIDOS in captured.out
     
-    @pytest.mark.asyncio
     async def test_run_examples_with_failures(self, capsys):
         """Testa execução de exemplos com falhas."""
         with patch('src.__main__.single_query', return_value=False) as mock_single_query:
@@ -368,108 +358,98 @@ class TestRunExamples:
             
             captured = capsys.readouterr()
             assert "⚠️ Exemplo falhou, continuando..." in captured.out
-            assert "✅ Exemplos concluídos!" in captured.out
+            assert _EXEMPLOS_CONCLUIDOS in captured.out
+
+
+@pytest.fixture(scope="module")
+def parser():
+    """Parser do CLI, construído uma vez para o módulo."""
+    return _build_parser()
 
 
 class TestMainFunction:
     """Testes para a função main()."""
     
-    @pytest.mark.asyncio
-    async def test_main_no_arguments(self):
+    def test_build_parser_is_cached(self, parser):
+        """Testa se _build_parser() reutiliza o mesmo parser."""
+        assert _build_parser() is parser
+    
+    @patch('sys.argv', ['__main__.py'])
+    @patch('src.__main__.print_header')
+    @patch('src.__main__.interactive_mode')
+    async def test_main_no_arguments(self, mock_interactive, mock_header):
         """Testa main() sem argumentos (modo interativo)."""
-        with patch('sys.argv', ['__main__.py']):
-            with patch('src.__main__.print_header') as mock_header:
-                with patch('src.__main__.interactive_mode') as mock_interactive:
-                    await main()
-                    
-                    mock_header.assert_called_once()
-                    mock_interactive.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_main_with_prompt(self):
-        """Testa main() com prompt direto."""
-        with patch('sys.argv', ['__main__.py', 'Pergunta teste']):
-            with patch('src.__main__.single_query') as mock_single_query:
-                await main()
-                
-                mock_single_query.assert_called_once_with('Pergunta teste', None)
-    
-    @pytest.mark.asyncio
-    async def test_main_chat_mode(self):
-        """Testa main() com modo chat."""
-        with patch('sys.argv', ['__main__.py', '--chat']):
-            with patch('src.__main__.chat_mode') as mock_chat:
-                await main()
-                
-                mock_chat.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_main_example_mode(self):
-        """Testa main() com modo exemplos."""
-        with patch('sys.argv', ['__main__.py', '--example']):
-            with patch('src.__main__.run_examples') as mock_examples:
-                await main()
-                
-                mock_examples.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_main_with_tools_option(self):
+        await main()
+        
+        mock_header.assert_called_once()
+        mock_interactive.assert_called_once()
+    
+    @pytest.mark.parametrize(
+        "argv,target,expected_args",
+        [
+            pytest.param([], "interactive_mode", (), id="interactive"),
+            pytest.param(
+                ["Pergunta teste"], "single_query", ("Pergunta teste", None), id="prompt"
+            ),
+            pytest.param(["--chat"], "chat_mode", (), id="chat"),
+            pytest.param(["--example"], "run_examples", (), id="example"),
+        ],
+    )
+    async def test_main_dispatches(self, parser, argv, target, expected_args):
+        """Testa se main() despacha para o modo escolhido pelos argumentos."""
+        with patch(f"src.__main__.{target}") as mock_mode:
+            await main(parser.parse_args(argv))
+        
+        mock_mode.assert_called_once_with(*expected_args)
+    
+    @patch('src.__main__.single_query')
+    async def test_main_with_tools_option(self, mock_single_query, parser):
         """Testa main() com opção --tools."""
-        with patch('sys.argv', ['__main__.py', '--tools', 'Read,Write', 'Pergunta']):
-            with patch('src.__main__.single_query') as mock_single_query:
-                await main()
-                
-                # Verifica se options foi passado corretamente
-                args, kwargs = mock_single_query.call_args
-                assert args[0] == 'Pergunta'
-                options = args[1]
-                assert options is not None
-                assert options.allowed_tools == ['Read', 'Write']
-    
-    @pytest.mark.asyncio
-    async def test_main_with_system_option(self):
+        await main(parser.parse_args(['--tools', 'Read,Write', 'Pergunta']))
+        
+        # Verifica se options foi passado corretamente
+        args, kwargs = mock_single_query.call_args
+        assert args[0] == 'Pergunta'
+        options = args[1]
+        assert options is not None
+        assert options.allowed_tools == ['Read', 'Write']
+    
+    @patch('src.__main__.single_query')
+    async def test_main_with_system_option(self, mock_single_query, parser):
         """Testa main() com opção --system."""
-        with patch('sys.argv', ['__main__.py', '--system', 'Custom prompt', 'Pergunta']):
-            with patch('src.__main__.single_query') as mock_single_query:
-                await main()
-                
-                args, kwargs = mock_single_query.call_args
-                options = args[1]
-                assert options.system_prompt == 'Custom prompt'
-    
-    @pytest.mark.asyncio
-    async def test_main_no_header_option(self):
+        await main(parser.parse_args(['--system', 'Custom prompt', 'Pergunta']))
+        
+        args, kwargs = mock_single_query.call_args
+        options = args[1]
+        assert options.system_prompt == 'Custom prompt'
+    
+    @patch('src.__main__.print_header')
+    @patch('src.__main__.interactive_mode')
+    async def test_main_no_header_option(self, mock_interactive_mode, mock_header, parser):
         """Testa main() com opção --no-header."""
-        with patch('sys.argv', ['__main__.py', '--no-header']):
-            with patch('src.__main__.print_header') as mock_header:
-                with patch('src.__main__.interactive_mode'):
-                    await main()
-                    
-                    mock_header.assert_not_called()
-    
-    @pytest.mark.asyncio
-    async def test_main_keyboard_interrupt(self, capsys):
+        await main(parser.parse_args(['--no-header']))
+        
+        mock_header.assert_not_called()
+    
+    @patch('src.__main__.interactive_mode', side_effect=KeyboardInterrupt)
+    async def test_main_keyboard_interrupt(self, mock_interactive_mode, capsys, parser):
         """Testa KeyboardInterrupt na função main()."""
-        with patch('sys.argv', ['__main__.py']):
-            with patch('src.__main__.interactive_mode', side_effect=KeyboardInterrupt):
-                with pytest.raises(SystemExit) as exc_info:
-                    await main()
-                
-                assert exc_info.value.code == 0
-                captured = capsys.readouterr()
-                assert "👋 Interrompido pelo usuário!" in captured.out
-    
-    @pytest.mark.asyncio
-    async def test_main_general_exception(self, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            await main(parser.parse_args([]))
+        
+        assert exc_info.value.code == 0
+        captured = capsys.readouterr()
+        assert _INTERROMPIDO in captured.out
+    
+    @patch('src.__main__.interactive_mode', side_effect=Exception("Erro teste"))
+    async def test_main_general_exception(self, mock_interactive_mode, capsys, parser):
         """Testa exceção geral na função main()."""
-        with patch('sys.argv', ['__main__.py']):
-            with patch('src.__main__.interactive_mode', side_effect=Exception("Erro teste")):
-                with pytest.raises(SystemExit) as exc_info:
-                    await main()
-                
-                assert exc_info.value.code == 1
-                captured = capsys.readouterr()
-                assert "❌ Erro: Erro teste" in captured.out
+        with pytest.raises(SystemExit) as exc_info:
+            await main(parser.parse_args([]))
+        
+        assert exc_info.value.code == 1
+        captured = capsys.readouterr()
+        assert _ERRO_TESTE in captured.out
 
 
 class TestRunFunction:
@@ -489,7 +469,7 @@ class TestRunFunction:
             
             assert exc_info.value.code == 0
             captured = capsys.readouterr()
-            assert "👋 Até logo!" in captured.out
+            assert _ATE_LOGO in captured.out
 
 
 class TestMainEntryPoint:
@@ -506,18 +486,14 @@ class TestMainEntryPoint:
 # Fixtures e helpers para testes
 @pytest.fixture
 def mock_claude_client():
-    """Fixture que retorna um mock do ClaudeSDKClient."""
-    client = AsyncMock(spec=ClaudeSDKClient)
-    return client
+    """Fixture que retorna um ClaudeSDKClient falso, sem respostas."""
+    return FakeClaudeClient()
 
 
 @pytest.fixture
 def sample_text_message():
     """Fixture que retorna uma mensagem de texto de exemplo."""
-    return AssistantMessage(
-        content=[TextBlock(text="Texto de exemplo")],
-        model="claude-3-5-sonnet-20241022"
-    )
+    return _msg("Texto de exemplo")
 
 
 @pytest.fixture
@@ -539,25 +515,18 @@ def sample_result_message():
 class TestIntegrationScenarios:
     """Testes de integração simulando cenários reais."""
     
-    @pytest.mark.asyncio
-    async def test_complete_interaction_flow(self, capsys):
+    @patch('src.__main__.query')
+    async def test_complete_interaction_flow(self, mock_query, capsys, monkeypatch):
         """Testa um fluxo completo de interação."""
-        text_block = TextBlock(text="Olá! Como posso ajudar?")
-        message = AssistantMessage(content=[text_block], model="claude-3-5-sonnet-20241022")
+        monkeypatch.setattr("builtins.input", scripted_input("Como você está?", "sair"))
+        mock_query.return_value = async_iter(_msg("Olá! Como posso ajudar?"))
         
-        async def async_generator():
-            yield message
+        await interactive_mode()
         
-        with patch('builtins.input', side_effect=["Como você está?", "sair"]):
-            with patch('src.__main__.query') as mock_query:
-                mock_query.return_value = async_generator()
-                
-                await interactive_mode()
-                
-                captured = capsys.readouterr()
-                assert "💬 Modo Interativo" in captured.out
-                assert "📝 Claude: Olá! Como posso ajudar?" in captured.out
-                assert "👋 Até logo!" in captured.out
+        captured = capsys.readouterr()
+        assert "💬 Modo Interativo" in captured.out
+        assert "📝 Claude: Olá! Como posso ajudar?" in captured.out
+        assert _ATE_LOGO in captured.out
 
 
 if __name__ == "__main__":
@@ -4,8 +4,12 @@ Testes abrangentes para o módulo profiler.
 
 import pytest
 import asyncio
+import sys
+import threading
 import time
+from collections.abc import Mapping
 from unittest.mock import patch, Mock
+from src.tools import profiler as profiler_module
 from src.tools.profiler import AsyncProfiler, profile_query, get_profiler
 
 
@@ -17,13 +21,18 @@ class TestProfiler:
         """Fixture que cria uma nova instância do profiler para cada teste."""
         return AsyncProfiler()
     
+    @pytest.fixture
+    def profiling_enabled(self, monkeypatch):
+        """Fixture que liga o profiling global para testar o decorator."""
+        monkeypatch.setattr(profiler_module, "_ENABLED", True)
+    
     def test_profiler_initialization(self):
         """Teste 1: Testar criação do AsyncProfiler."""
         profiler = AsyncProfiler()
         
-        assert isinstance(profiler.timings, dict)
-        assert isinstance(profiler.active_timers, dict)
-        assert len(profiler.timings) == 0
+        assert isinstance(profiler.stats, dict)
+        assert isinstance(profiler.active_timers, Mapping)
+        assert len(profiler.stats) == 0
         assert len(profiler.active_timers) == 0
     
     def test_profiler_timer_start_stop(self, profiler):
@@ -41,8 +50,8 @@ class TestProfiler:
         duration = profiler.end_timer(operation_name)
         
         assert operation_name not in profiler.active_timers
-        assert operation_name in profiler.timings
-        assert len(profiler.timings[operation_name]) == 1
+        assert operation_name in profiler.stats
+        assert profiler.stats[operation_name].count == 1
         assert duration > 0
         assert isinstance(duration, float)
     
@@ -53,7 +62,7 @@ class TestProfiler:
         # Adicionar algumas medições
         durations = [0.1, 0.2, 0.3, 0.4, 0.5]
         for duration in durations:
-            with patch('time.time', side_effect=[0, duration]):
+            with patch('time.perf_counter_ns', side_effect=[0, round(duration * 1e9)]):
                 profiler.start_timer(operation_name)
                 profiler.end_timer(operation_name)
         
@@ -79,14 +88,14 @@ class TestProfiler:
         time.sleep(0.001)
         profiler.end_timer(outer_op)
         
-        assert outer_op in profiler.timings
-        assert inner_op in profiler.timings
-        assert len(profiler.timings[outer_op]) == 1
-        assert len(profiler.timings[inner_op]) == 1
+        assert outer_op in profiler.stats
+        assert inner_op in profiler.stats
+        assert profiler.stats[outer_op].count == 1
+        assert profiler.stats[inner_op].count == 1
         
         # Timer externo deve ter duração maior que o interno
-        outer_duration = profiler.timings[outer_op][0]
-        inner_duration = profiler.timings[inner_op][0]
+        outer_duration = profiler.stats[outer_op].total
+        inner_duration = profiler.stats[inner_op].total
         assert outer_duration > inner_duration
     
     def test_profiler_concurrent_operations(self, profiler):
@@ -105,12 +114,62 @@ class TestProfiler:
         time.sleep(0.001)
         profiler.end_timer(op1)
         
-        assert op1 in profiler.timings
-        assert op2 in profiler.timings
-        assert len(profiler.timings[op1]) == 1
-        assert len(profiler.timings[op2]) == 1
+        assert op1 in profiler.stats
+        assert op2 in profiler.stats
+        assert profiler.stats[op1].count == 1
+        assert profiler.stats[op2].count == 1
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("warm_parent", [False, True], ids=["fresh", "warm_parent"])
+    async def test_profiler_same_operation_in_concurrent_tasks(
+        self, profiler, warm_parent
+    ):
+        """Teste 5b: Tasks concorrentes não sobrescrevem o timer uma da outra."""
+        if warm_parent:
+            # O contexto pai já usou o profiler antes de criar as tasks
+            profiler.start_timer("warm")
+            profiler.end_timer("warm")
+
+        async def timed():
+            profiler.start_timer("shared_op")
+            await asyncio.sleep(0.001)
+            return profiler.end_timer("shared_op")
+
+        durations = await asyncio.gather(timed(), timed())
+
+        assert all(d > 0 for d in durations)
+        assert profiler.stats["shared_op"].count == 2
+    
+    def test_profiler_report_while_other_thread_records(self, profiler):
+        """Teste 5c: report()/get_stats() não quebram com outra thread gravando."""
+        # Muitas operações deixam cada iteração do report() longa o bastante
+        # para a outra thread inserir chaves no meio dela
+        for i in range(1000):
+            profiler.start_timer(f"seed_op_{i}")
+            profiler.end_timer(f"seed_op_{i}")
+
+        def record_new_operations():
+            for i in range(5000):
+                profiler.start_timer(f"thread_op_{i}")
+                profiler.end_timer(f"thread_op_{i}")
+
+        # Troca de thread mais frequente para forçar a intercalação
+        old_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        writer = threading.Thread(target=record_new_operations)
+        writer.start()
+        try:
+            while writer.is_alive():
+                profiler.report()
+                profiler.get_stats("seed_op_0")
+        finally:
+            writer.join()
+            sys.setswitchinterval(old_interval)
+
+        assert len(profiler.stats) == 6000
     
     @pytest.mark.asyncio
+    @pytest.mark.usefixtures("profiling_enabled")
     async def test_profile_query_decorator(self):
         """Teste 6: Testar decorator profile_query."""
         
@@ -121,17 +180,17 @@ class TestProfiler:
         
         # Limpar profiler global antes do teste
         global_profiler = get_profiler()
-        global_profiler.timings.clear()
-        global_profiler.active_timers.clear()
+        global_profiler.reset()
         
         result = await sample_async_function()
         
         assert result == "test_result"
-        assert "decorated_operation" in global_profiler.timings
-        assert len(global_profiler.timings["decorated_operation"]) == 1
-        assert global_profiler.timings["decorated_operation"][0] > 0
+        assert "decorated_operation" in global_profiler.stats
+        assert global_profiler.stats["decorated_operation"].count == 1
+        assert global_profiler.stats["decorated_operation"].total > 0
     
     @pytest.mark.asyncio
+    @pytest.mark.usefixtures("profiling_enabled")
     async def test_profile_query_with_custom_name(self):
         """Teste 7: Testar decorator com nome customizado."""
         
@@ -142,14 +201,28 @@ class TestProfiler:
         
         # Limpar profiler global
         global_profiler = get_profiler()
-        global_profiler.timings.clear()
-        global_profiler.active_timers.clear()
+        global_profiler.reset()
         
         result = await another_async_function()
         
         assert result == {"status": "success"}
-        assert "custom_name_operation" in global_profiler.timings
-        assert len(global_profiler.timings["custom_name_operation"]) == 1
+        assert "custom_name_operation" in global_profiler.stats
+        assert global_profiler.stats["custom_name_operation"].count == 1
+    
+    @pytest.mark.asyncio
+    async def test_profile_query_disabled_returns_function(self, monkeypatch):
+        """Teste 7b: Com profiling desligado o decorator não embrulha a função."""
+        monkeypatch.setattr(profiler_module, "_ENABLED", False)
+        
+        async def plain_function():
+            return "plain"
+        
+        global_profiler = get_profiler()
+        global_profiler.reset()
+        
+        assert profile_query("disabled_operation")(plain_function) is plain_function
+        assert await plain_function() == "plain"
+        assert "disabled_operation" not in global_profiler.stats
     
     def test_get_profiler_singleton(self):
         """Teste 8: Testar que get_profiler retorna singleton."""
@@ -189,23 +262,22 @@ class TestProfiler:
         profiler.start_timer("reset_test_2")
         profiler.end_timer("reset_test_2")
         
-        assert len(profiler.timings) == 2
+        assert len(profiler.stats) == 2
         
-        # Reset manual (limpando os dicts)
-        profiler.timings.clear()
-        profiler.active_timers.clear()
+        profiler.start_timer("reset_pending")
+        profiler.reset()
         
-        assert len(profiler.timings) == 0
+        assert len(profiler.stats) == 0
         assert len(profiler.active_timers) == 0
     
     def test_profiler_report_generation(self, profiler):
         """Teste 11: Testar geração de relatório."""
         # Adicionar algumas operações
-        with patch('time.time', side_effect=[0, 0.1]):
+        with patch('time.perf_counter_ns', side_effect=[0, 100_000_000]):
             profiler.start_timer("report_op_1")
             profiler.end_timer("report_op_1")
         
-        with patch('time.time', side_effect=[0, 0.2]):
+        with patch('time.perf_counter_ns', side_effect=[0, 200_000_000]):
             profiler.start_timer("report_op_2")
             profiler.end_timer("report_op_2")
         
@@ -229,7 +301,7 @@ class TestProfiler:
             time.sleep(0.001)  # 1ms para cada operação
             profiler.end_timer(operation_name)
         
-        assert len(profiler.timings[operation_name]) == 5
+        assert profiler.stats[operation_name].count == 5
         
         stats = profiler.get_stats(operation_name)
         assert stats["count"] == 5
@@ -238,10 +310,11 @@ class TestProfiler:
         assert stats["min"] > 0
         assert stats["max"] > 0
         
-        # Todas as durações devem ser positivas
-        assert all(d > 0 for d in profiler.timings[operation_name])
+        # Mesmo a menor duração deve ser positiva
+        assert profiler.stats[operation_name].min > 0
     
     @pytest.mark.asyncio
+    @pytest.mark.usefixtures("profiling_enabled")
     async def test_profile_query_exception_handling(self):
         """Teste 13: Testar tratamento de exceções no decorator."""
         
@@ -252,15 +325,14 @@ class TestProfiler:
         
         # Limpar profiler global
         global_profiler = get_profiler()
-        global_profiler.timings.clear()
-        global_profiler.active_timers.clear()
+        global_profiler.reset()
         
         with pytest.raises(ValueError, match="Test exception"):
             await failing_function()
         
         # Mesmo com exceção, o timer deve ser finalizado
-        assert "exception_operation" in global_profiler.timings
-        assert len(global_profiler.timings["exception_operation"]) == 1
+        assert "exception_operation" in global_profiler.stats
+        assert global_profiler.stats["exception_operation"].count == 1
         assert len(global_profiler.active_timers) == 0  # Timer deve ser limpo
     
     def test_profiler_empty_report(self):
@@ -273,6 +345,7 @@ class TestProfiler:
         # Deve ter apenas o cabeçalho se não há operações
     
     @pytest.mark.asyncio
+    @pytest.mark.usefixtures("profiling_enabled")
     async def test_profile_query_default_name(self):
         """Teste 15: Testar decorator com nome padrão."""
         
@@ -283,11 +356,10 @@ class TestProfiler:
         
         # Limpar profiler global
         global_profiler = get_profiler()
-        global_profiler.timings.clear()
-        global_profiler.active_timers.clear()
+        global_profiler.reset()
         
         result = await default_named_function()
         
         assert result == "default_test"
-        assert "query" in global_profiler.timings  # Nome padrão é "query"
-        assert len(global_profiler.timings["query"]) == 1
\ No newline at end of file
+        assert "query" in global_profiler.stats  # Nome padrão é "query"
+        assert global_profiler.stats["query"].count == 1
\ No newline at end of file
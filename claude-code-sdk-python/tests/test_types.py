@@ -72,6 +72,13 @@ class TestMessageTypes:
         assert msg.total_cost_usd == 0.01
         assert msg.session_id == "session-123"
 
+    def test_message_types_use_slots(self):
+        """Test that blocks and messages are slotted (no per-instance __dict__)."""
+        block = TextBlock(text="Hi")
+        msg = AssistantMessage(content=[block], model="claude-opus-4-1-20250805")
+        assert not hasattr(block, "__dict__")
+        assert not hasattr(msg, "__dict__")
+
 
 class TestOptions:
     """Test Options configuration."""